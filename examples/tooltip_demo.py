@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+
+import tkinter as tk
+from preflop_advisor.tooltip import CreateToolTip
+
+
+def main():
+    root = tk.Tk()
+    btn1 = tk.Button(root, text="button 1")
+    btn1.pack(padx=10, pady=5)
+    button1_ttp = CreateToolTip(btn1, "mouse is over button 1")
+    btn2 = tk.Button(root, text="button 2")
+    btn2.pack(padx=10, pady=5)
+    button2_ttp = CreateToolTip(btn2, "mouse is over button 2")
+    root.mainloop()
+
+
+if (__name__ == '__main__'):
+    main()
@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 
 import tkinter as tk
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from preflop_advisor.gui import MainWindow
 
 
+def setup_logging():
+    # log records are only queued in the gui thread, writing them to stderr
+    # happens in the listener thread so the mainloop never waits on the stream
+    log_queue = queue.Queue(-1)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
+
+
 def main():
-    root = tk.Tk()
-    MainWindow(root)
-    root.mainloop()
+    listener = setup_logging()
+    try:
+        root = tk.Tk()
+        MainWindow(root)
+        root.mainloop()
+    finally:
+        listener.stop()
 
 if __name__ == '__main__':
     main()
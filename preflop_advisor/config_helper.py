@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+from collections import namedtuple
+from configparser import ConfigParser
+import logging
+import os
+import pickle
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENDING = ".cache"
+# part of the cache, caches written with another version are parsed again
+CACHE_VERSION = 2
+# one line of the TreeInfos section: plrs,bb,game,folder,infos
+# label is the text shown above the output table, formatted once when the line is parsed
+TreeInfo = namedtuple("TreeInfo", "index plrs bb game folder infos label", defaults=("",))
+
+# Parsing config.ini with ConfigParser is slow compared to the rest of the startup
+# the parsed sections are pickled next to the config file as plain dicts
+# and reused as long as the modification time of the config file did not change
+
+
+class Section(dict):
+    '''
+    the options of one config section, keys are lowercased like in ConfigParser's SectionProxy
+    '''
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return dict.__getitem__(self, key.lower())
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key.lower(), value)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key.lower())
+
+    def get(self, key, default=None):
+        return dict.get(self, key.lower(), default)
+
+
+def load_settings(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except EnvironmentError:
+        logger.error("Could not find Config File: %s", path)
+        return {}
+
+    cache_path = path + CACHE_ENDING
+    try:
+        with open(cache_path, "rb") as f:
+            cached_version, cached_mtime, settings = pickle.load(f)
+        if cached_version == CACHE_VERSION and cached_mtime == mtime:
+            return settings
+    except (EnvironmentError, EOFError, ValueError, pickle.UnpicklingError):
+        pass  # no or broken cache -> parse config again
+
+    settings = parse_settings(path)
+    write_settings_cache(cache_path, mtime, settings)
+    return settings
+
+
+def parse_settings(path):
+    configs = ConfigParser()
+    configs.read(path)
+    return {section: Section(configs[section]) for section in configs.sections()}
+
+
+def write_settings_cache(cache_path, mtime, settings):
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump((CACHE_VERSION, mtime, settings), f)
+        os.replace(tmp_path, cache_path)
+    except EnvironmentError:
+        logger.warning("Could not write Config Cache: %s", cache_path)
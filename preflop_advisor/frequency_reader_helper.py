@@ -2,11 +2,15 @@ from preflop_advisor.tree_reader_helpers import ActionProcessor
 from preflop_advisor.tree_reader import  TreeReader
 from configparser import ConfigParser
 from preflop_advisor.hand_convert_helper import convert_hand
+from preflop_advisor.config_helper import TreeInfo
 
-import os
 import itertools
+import logging
+import os
 import pickle
 
+logger = logging.getLogger(__name__)
+
 RANKS = list("AKQJT98765432")
 SUITS = list("cdhs")
 CARDS = list(rank + suit for suit in SUITS for rank in RANKS)
@@ -35,10 +39,7 @@ def get_total_weight(filename):
                             all_combos.sort()
                             all_combos= list(all_combos for all_combos,_ in itertools.groupby(all_combos))
                             all_combos = [''.join(i) for i in all_combos if len(set(i))==5]
-                        weight_adjust=0
-                        for combo in all_combos:
-                            if convert_hand(combo)+ "\n" in line:
-                                weight_adjust+=1
+                        weight_adjust=sum(1 for combo in all_combos if convert_hand(combo) == hand)
                         WEIGHTS[hand]=weight_adjust
                     else:
                         weight_adjust=WEIGHTS[hand]
@@ -46,20 +47,16 @@ def get_total_weight(filename):
                     total_weight+=float(info_line.split(";")[0])*weight_adjust
         return total_weight
     except EnvironmentError:
-        logging.error("Could not find File: {}".format(filename))
+        logger.error("Could not find File: %s", filename)
         return total_weight
 
 def get_frequencies(action_before_list,position,position_list,tree_infos,configs):
     action_processor=ActionProcessor(
             position_list, tree_infos, configs)
-    valid_actions = configs["ValidActions"].replace(
-            " ", "").split(",")
-    valid_raise_sizes = configs["RaiseSizeList"].replace(
-            " ", "").split(",")
     #full_action_before_list=action_processor.get_action_sequence(action_before_list)
     
     weights=[]
-    for item in valid_actions:
+    for item in action_processor.valid_actions:
         action_sequence = action_before_list + [(position, item)]
         full_action_sequence = action_processor.get_action_sequence(action_sequence)
         full_action_sequence = action_processor.find_valid_raise_sizes(full_action_sequence)
@@ -70,23 +67,9 @@ def get_frequencies(action_before_list,position,position_list,tree_infos,configs
     frequencies=[i/full_weight*100 for i in weights]
     return frequencies
 
-def get_vs_first_in(row_pos,column_pos,position_list,tree_infos,configs):
-        if position == fi_position:
-            return []
-        if self.position_list.index(position) > self.position_list.index(fi_position):
-            # we face an open
-            results = self.action_processor.get_results(
-                self.hand, [(fi_position, "Raise")], position)
-        else:
-            # we face a 3bet after an open (could include sb limp -> bb raises?!)
-            results = self.action_processor.get_results(
-                self.hand, [(position, "Raise"),
-                            (fi_position, "Raise")], position
-            )
-        return results
-
 def get_default_frequencies(position_list,tree_infos,configs):
     results=[]
+    position_index = {pos: index for index, pos in enumerate(position_list)}
     row = []
     row.append("X")
     row.append("FI")
@@ -105,7 +88,7 @@ def get_default_frequencies(position_list,tree_infos,configs):
             if column_pos == row_pos:
                 row.append([])
                 continue
-            if position_list.index(row_pos) > position_list.index(column_pos):
+            if position_index[row_pos] > position_index[column_pos]:
                 row.append((get_frequencies([(column_pos,"Raise")],row_pos,position_list,tree_infos,configs)))
             else:
                 row.append((get_frequencies([(row_pos,"Raise"),(column_pos,"Raise")],row_pos,position_list,tree_infos,configs)))
@@ -115,6 +98,7 @@ def get_default_frequencies(position_list,tree_infos,configs):
 def get_position_frequencies(position_list,position,tree_infos,configs):
         # Info Line
         results=[]
+        position_index = {pos: index for index, pos in enumerate(position_list)}
         row = []
         row.append(position)
         for pos in position_list:
@@ -135,8 +119,8 @@ def get_position_frequencies(position_list,position,tree_infos,configs):
         row = ["squeeze"]
         for column_pos in position_list:
 
-            pos_index = position_list.index(position)
-            rfi_index = position_list.index(column_pos)
+            pos_index = position_index[position]
+            rfi_index = position_index[column_pos]
 
             if pos_index <= rfi_index + 1:  # we have to have at least one player in between rfi and coldcaller
                 row.append("")
@@ -155,8 +139,8 @@ def get_position_frequencies(position_list,position,tree_infos,configs):
         for column_pos in position_list:
 
 
-            pos_index = position_list.index(position)
-            threebet_pos_index = position_list.index(column_pos)
+            pos_index = position_index[position]
+            threebet_pos_index = position_index[column_pos]
 
             if position == column_pos:
                 row.append("")
@@ -177,12 +161,12 @@ def get_position_frequencies(position_list,position,tree_infos,configs):
         row = ["vs 4bet"]
         for column_pos in position_list:
 
-            pos_index = position_list.index(position)
+            pos_index = position_index[position]
             # both same position or utg spot where there is no possible face 4bet
             if position == column_pos or pos_index == 0:
                 row.append("")
                 continue
-            if pos_index > position_list.index(column_pos):
+            if pos_index > position_index[column_pos]:
                 # we 3bet and face a 4bet from the opener:
                 row.append(get_frequencies([(column_pos, "Raise"), (position, "Raise"), (column_pos, "Raise")],
                                            position,
@@ -203,8 +187,8 @@ def get_position_frequencies(position_list,position,tree_infos,configs):
         # vs squeeze
         row = ["vs squeeze"]
         for column_pos in position_list:
-            pos_index = position_list.index(position)
-            squeeze_index = position_list.index(column_pos)
+            pos_index = position_index[position]
+            squeeze_index = position_index[column_pos]
 
             if squeeze_index <= pos_index + 1:  # squeezer must be after opener + at least one coldcall in between
                 row.append("")
@@ -246,14 +230,11 @@ def test():
     config = ConfigParser()
     config.read("config.ini")
     config = config["TreeReader"]
-    tree = {"folder": "/mnt/e196db6e-5358-4294-8cb4-208fe9585b0e/monker/ranges/Omaha/6-way/150bb-no-rake/",
-            "NumPlayers": 6}
-    tree = {"folder": "/home/johann/monker-beta/ranges/Omaha5/HU/50bb",
-            "NumPlayers": 2}
-    #tree = {"folder": "/mnt/e196db6e-5358-4294-8cb4-208fe9585b0e/monker/ranges/Omaha/6-way/50bb-z500/",
-    #       "NumPlayers": 6}
+    tree = TreeInfo(0, 6, 150, "PLO", "/mnt/e196db6e-5358-4294-8cb4-208fe9585b0e/monker/ranges/Omaha/6-way/150bb-no-rake/", "")
+    tree = TreeInfo(0, 2, 50, "PLO5", "/home/johann/monker-beta/ranges/Omaha5/HU/50bb", "")
+    #tree = TreeInfo(0, 6, 50, "PLO", "/mnt/e196db6e-5358-4294-8cb4-208fe9585b0e/monker/ranges/Omaha/6-way/50bb-z500/", "")
     position_list = config["Positions"].split(",")
-    position_list = position_list[0:tree['NumPlayers']]
+    position_list = position_list[0:tree.plrs]
     position_list.reverse()
     action_before_list=[("UTG","Raise")]
     position='MP'
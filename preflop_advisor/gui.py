@@ -3,7 +3,7 @@
 import tkinter as tk
 import os
 import inspect
-from configparser import ConfigParser
+from preflop_advisor.config_helper import load_settings
 from preflop_advisor.card_selector import CardSelector
 from preflop_advisor.tree_selector import TreeSelector
 from preflop_advisor.position_selector import PositionSelector
@@ -18,10 +18,9 @@ class MainWindow:
     def __init__(self, root):
         self.root = root
 
-        self.configs = ConfigParser()
         config_path = os.path.join(os.path.dirname(
             os.path.abspath(inspect.getsourcefile(lambda: 0))), 'config.ini')
-        self.configs.read(config_path)
+        self.configs = load_settings(config_path)
 
         self.root.title("Preflop Advisor based on Monker")
 
@@ -68,7 +67,7 @@ class MainWindow:
 
     def update_output_frame(self):
         tree_infos = self.tree_selector.get_tree_infos()
-        game = tree_infos["game"]
+        game = tree_infos.game
 
         # change active positions and get position after that (otherwise inactive position can be selected)
         self.update_card_and_position_selector(tree_infos)
@@ -83,8 +82,8 @@ class MainWindow:
     def update_card_and_position_selector(self, tree_infos):
         # select 4 or 2 cards in card_selector depending on game
         # update possible position buttons based on tree
-        num_players = tree_infos["plrs"]
-        game = tree_infos["game"]
+        num_players = tree_infos.plrs
+        game = tree_infos.game
 
         if game in ["PLO", "PLO8"]:
             self.card_selector.set_num_cards(4)
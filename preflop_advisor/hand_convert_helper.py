@@ -6,6 +6,8 @@ import glob
 import json
 import os
 
+logger = logging.getLogger(__name__)
+
 RANK_ORDER = {'A': 12, 'K': 11, 'Q': 10, 'J': 9, 'T': 8, '9': 7,
               '8': 6, '7': 5, '6': 4, '5': 3, '4': 2, '3': 1, '2': 0}
 RANKS = list("AKQJT98765432")
@@ -22,14 +24,14 @@ def convert_hand(hand):
         return convert_holdem_hand(hand)
     elif len(hand) == 10:
         return convert_omaha5_hand(hand)
-    logging.error(
-            "Hand: {} cannot be converted...wrong length".format(hand))
+    logger.error(
+            "Hand: %s cannot be converted...wrong length", hand)
     return hand
 
 def convert_holdem_hand(hand):
     if len(hand) != 4:
-        logging.error(
-            "NL Hand: {} cannot be converted...wrong length".format(hand))
+        logger.error(
+            "NL Hand: %s cannot be converted...wrong length", hand)
     ranks = [hand[0],hand[2]]
     suits = [hand[1],hand[3]]
     ranks.sort(key=lambda x: RANK_ORDER[x],reverse=True)
@@ -42,20 +44,20 @@ def convert_holdem_hand(hand):
     
 def convert_omaha_hand(hand):
     if len(hand) != 8:
-        logging.error(
-            "Omaha Hand: {} cannot be converted...wrong length".format(hand))
+        logger.error(
+            "Omaha Hand: %s cannot be converted...wrong length", hand)
         return hand
     ranks = [hand[0], hand[2], hand[4], hand[6]]
     suits = [hand[1], hand[3], hand[5], hand[7]]
     for rank in ranks:
         if rank not in RANKS:
-            logging.error(
-                "Hand: {} cannot be converted...invalid ranks".format(hand))
+            logger.error(
+                "Hand: %s cannot be converted...invalid ranks", hand)
             return hand
     for suit in suits:
         if suit not in SUITS:
-            logging.error(
-                "Hand: {} cannot be converted...invalid suits".format(hand))
+            logger.error(
+                "Hand: %s cannot be converted...invalid suits", hand)
             return hand
     cards = [hand[0:2], hand[2:4], hand[4:6], hand[6:8]]
     suit_count = {"s": 0, "d": 0, "h": 0, "c": 0}
@@ -114,14 +116,14 @@ def convert_omaha_hand(hand):
 
 def convert_omaha5_hand(hand):
     if len(hand) != 8 and len(hand) !=10:
-        logging.error(
-            "Omaha Hand: {} cannot be converted...wrong length".format(hand))
+        logger.error(
+            "Omaha Hand: %s cannot be converted...wrong length", hand)
         return hand
     ranks = [x for x in hand if x in RANKS]
     suits = [x for x in hand if x in SUITS]
     if len(ranks) != 4 and len(ranks) != 5 or len(ranks)-len(suits)!=0:
-        logging.error(
-            "Omaha Hand: {} cannot be converted".format(hand))
+        logger.error(
+            "Omaha Hand: %s cannot be converted", hand)
         return hand
 
     cards = [hand[i:i+2] for i in range(0,len(hand),2)]
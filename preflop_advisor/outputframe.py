@@ -25,6 +25,8 @@ class OutputFrame(tk.Frame):
         self.root = root
         self.output_configs = output_configs
         self.tree_reader_configs = tree_reader_configs
+        # (hand, position, tree) of the table that is currently shown
+        self.shown = None
 
         self.info_frame = tk.Frame(root)
         self.general_infos = tk.StringVar()
@@ -33,7 +35,7 @@ class OutputFrame(tk.Frame):
             textvariable=self.general_infos,
             font=INFO_FONT).grid(row=0, column=5)
 
-        self.card_labels()
+        self.create_card_labels()
 
         self.update_info_frame(hand="", position="", treeinfo="")
 
@@ -46,7 +48,7 @@ class OutputFrame(tk.Frame):
         self.info_frame.grid(row=0, column=0, pady=5)
         self.output_frame.grid(row=1, column=0)
 
-    def card_labels(self):
+    def create_card_labels(self):
         self.card_str_list = [tk.StringVar() for i in range(5)]
         self.card_labels = [tk.Label(self.info_frame,
                                      textvariable=self.card_str_list[i],
@@ -73,15 +75,17 @@ class OutputFrame(tk.Frame):
         self.general_infos.set(text)
 
     def update_output_frame(self, hand, position, tree):
+        # e.g. deselecting and selecting the same card again leads to the same table
+        if (hand, position, tree) == self.shown:
+            return
+        # only set once the table is complete, so a failed update is tried again
+        self.shown = None
         # tree_reader.fill_default_results()
         tree_reader = TreeReader(hand, position, tree,
                                  self.tree_reader_configs)
         results = tree_reader.get_results()
 
-        tree_infos = "{}-max {}bb {} {}".format(
-            tree["plrs"], tree["bb"], tree["game"], tree["infos"])
-
-        self.update_info_frame(hand, position, tree_infos)
+        self.update_info_frame(hand, position, tree.label)
 
         for row in range(RESULT_ROWS):
             for column in range(RESULT_COLUMNS):
@@ -89,12 +93,13 @@ class OutputFrame(tk.Frame):
 
         for row in range(len(results)):
             for column in range(len(results[0])):
-                if results[row][column]["isInfo"]:
+                if results[row][column].isInfo:
                     self.table_entries[row][column].set_description_label(
-                        results[row][column]["Text"])
+                        results[row][column].text)
                 else:
                     self.table_entries[row][column].set_result_label(
-                        self.preprocess_results(results[row][column]["Results"]))
+                        self.preprocess_results(results[row][column].results))
+        self.shown = (hand, position, tree)
 
     def create_result_grid(self):
         for row in range(RESULT_ROWS):
@@ -12,6 +12,10 @@ class PositionSelector(tk.Frame):
         self.position_list = position_config["PositionList"].split(",")
         self.position_inactive_list = position_config["PositionInactive"].split(
             ",")
+        # the first position (X, the overview) is always active, the others are taken from bb backwards
+        self.reversed_positions = tuple(reversed(self.position_list))
+        # num_players -> (active positions, mask of the enabled buttons), both immutable
+        self._active_positions = {}
 
         self.button_height = int(position_config["ButtonHeight"])
         self.button_width = int(position_config["ButtonWidth"])
@@ -20,11 +24,18 @@ class PositionSelector(tk.Frame):
         self.font = position_config["Font"]
         self.background = position_config["Background"]
         self.background_pressed = position_config["BackgroundPressed"]
+        # built once and shared by all buttons
+        self.button_font = (self.font, self.fontsize)
 
-        self.button_list = [self.create_button(
-            row) for row in range(len(self.position_list))]
         self.default_position = int(position_config["DefaultPosition"])
         self.current_position = self.default_position
+        # all position buttons share one variable so tk handles the dispatch
+        self.selected_position = tk.IntVar(self, value=self.current_position)
+
+        self.button_list = [self.create_button(
+            row) for row in range(len(self.position_list))]
+        # bit i set <=> button i is enabled (all buttons start in "normal" state)
+        self._enabled_mask = (1 << len(self.button_list)) - 1
 
         for item in self.position_inactive_list:
             if item in self.position_list:
@@ -32,35 +43,32 @@ class PositionSelector(tk.Frame):
         self.select_button(self.current_position)
 
     def create_button(self, row):
-        button = tk.Button(
-            self, text=self.position_list[row], command=self.on_button_clicked(row))
+        button = tk.Radiobutton(
+            self, text=self.position_list[row], variable=self.selected_position,
+            value=row, indicatoron=False, command=self.on_button_clicked)
         button.config(height=self.button_height,
                       width=self.button_width,
                       bg=self.background,
-                      font=(self.font, self.fontsize),
+                      selectcolor=self.background_pressed,
+                      font=self.button_font,
                       padx=self.button_pad, pady=self.button_pad)
         button.grid(row=row)
         return button
 
-    def on_button_clicked(self, row):
-        def event_handler():
-            self.process_button_clicked(row)
-        return event_handler
+    def on_button_clicked(self):
+        self.process_button_clicked(self.selected_position.get())
 
     def process_button_clicked(self, row):
         if row == self.current_position:
             return
-        self.deselect_button(self.current_position)
         self.current_position = row
         self.select_button(row)
         self.position_changed()
 
-    def deselect_button(self, row):
-        self.button_list[row].config(relief="raised", bg=self.background)
-
+    # without indicator tk draws the selected radiobutton sunken in selectcolor
+    # and the previously selected one raised again, so only the variable is set
     def select_button(self, row):
-        self.button_list[row].config(
-            relief="sunken", bg=self.background_pressed)
+        self.selected_position.set(row)
 
     def position_changed(self):
         self.update_output()
@@ -69,29 +77,48 @@ class PositionSelector(tk.Frame):
         return self.position_list[self.current_position]
 
     def update_active_positions(self, num_players):
-        active_positions = list(reversed(self.position_list))
-        active_positions=[active_positions[-1]] + active_positions[:num_players]
+        active_positions, new_mask = self.get_active_positions(num_players)
 
         if self.get_position() not in active_positions:
-             self.process_button_clicked(self.default_position)
-             self.current_position = self.default_position
-            
-        for position in self.position_list:
-            if position in active_positions and position not in self.position_inactive_list:
-                index=self.convert_position_name_to_index(position)
+            # only called while the output is being updated, so selecting
+            # the default must not trigger another update through position_changed
+            self.current_position = self.default_position
+            self.select_button(self.default_position)
+
+        # only touch the buttons whose state actually changes
+        changed = new_mask ^ self._enabled_mask
+        while changed:
+            bit = changed & -changed
+            index = bit.bit_length() - 1
+            if new_mask & bit:
                 self.activate_button(index)
             else:
-                self.deactivate_button(self.convert_position_name_to_index(position))
-            
+                self.deactivate_button(index)
+            changed ^= bit
+
+    def get_active_positions(self, num_players):
+        # the active positions only depend on num_players, so they are computed once per tree size
+        cached = self._active_positions.get(num_players)
+        if cached is None:
+            active_positions = self.reversed_positions
+            active_positions = frozenset((active_positions[-1],) + active_positions[:num_players])
+            new_mask = 0
+            for index, position in enumerate(self.position_list):
+                if position in active_positions and position not in self.position_inactive_list:
+                    new_mask |= 1 << index
+            cached = self._active_positions[num_players] = (active_positions, new_mask)
+        return cached
 
     def convert_position_name_to_index(self, name):
         return self.position_list.index(name)
 
     def deactivate_button(self, index):
         self.button_list[index]['state'] = "disabled"
+        self._enabled_mask &= ~(1 << index)
 
     def activate_button(self, index):
         self.button_list[index]['state'] = "normal"
+        self._enabled_mask |= 1 << index
 
 
 def test(root):
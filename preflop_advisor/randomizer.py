@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import tkinter as tk
-from configparser import ConfigParser
+from preflop_advisor.config_helper import load_settings
 from random import randint
 
 
@@ -35,8 +35,7 @@ class RandomButton(tk.Frame):
 
 
 def test(root):
-    configs = ConfigParser()
-    configs.read("config.ini")
+    configs = load_settings("config.ini")
     settings = configs["PositionSelector"]
     rand_button = RandomButton(root, settings)
     rand_button.grid(row=0, column=0)
@@ -1,57 +1,168 @@
 #!/usr/bin/env python3
+import functools
 import os.path
 import tkinter as tk
-from PIL import ImageTk, Image
 
+IMAGE_SIZE = (800, 800)  # change to default sizing
+IMAGE_ENDINGS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+BINDTAG = "ToolTip"
+# position of the tooltip window relative to the widget's upper left corner
+OFFSET_X = 200  # 25
+OFFSET_Y = -300  # 20
+# look of the text tooltips, registered once in the option database
+TEXT_OPTIONS = {
+    "justify": "left",
+    "background": "yellow",
+    "relief": "solid",
+    "borderWidth": "1",
+    "font": "courier 8 normal",
+}
 
-class CreateToolTip(object):
+
+class ToolTip(object):
     '''
-    create a tooltip for a given widget
+    base class of the tooltips, shows a window next to the given widget on hover
     '''
+    __slots__ = ("widget",)
+    # all tooltip widgets share the class bindings of BINDTAG,
+    # the handlers look up the tooltip by the widget's path name
+    _tooltips = {}
+    _bound = False
+    # one window shared by all tooltips, built on the first hover
+    _window = None
+    _text_label = None
+    _image_label = None
+    _current = None
 
-    def __init__(self, widget, text='widget info', pic=False):
+    def __init__(self, widget):
         self.widget = widget
-        self.text = text
-        self.pic = pic
-        self.widget.bind("<Enter>", self.enter)
-        self.widget.bind("<Leave>", self.close)
+        ToolTip._tooltips[str(widget)] = self
+        if not ToolTip._bound:
+            widget.bind_class(BINDTAG, "<Enter>", ToolTip.on_enter)
+            widget.bind_class(BINDTAG, "<Leave>", ToolTip.on_leave)
+            widget.bind_class(BINDTAG, "<Destroy>", ToolTip.on_destroy)
+            for option, value in TEXT_OPTIONS.items():
+                widget.option_add("*ToolTipWindow.text." + option, value, "widgetDefault")
+            ToolTip._bound = True
+        # widget bindings stay untouched, the tag is just processed first
+        if BINDTAG not in widget.bindtags():
+            widget.bindtags((BINDTAG,) + widget.bindtags())
+
+    @staticmethod
+    def on_enter(event):
+        ToolTip._tooltips[str(event.widget)].enter(event)
+
+    @staticmethod
+    def on_leave(event):
+        ToolTip._tooltips[str(event.widget)].close(event)
+
+    @staticmethod
+    def on_destroy(event):
+        ToolTip._tooltips.pop(str(event.widget), None)
 
     def enter(self, event=None):
-        x = y = 0
-        x, y, cx, cy = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + 200  # 25
-        y += self.widget.winfo_rooty() - 300  # 20
+        x = self.widget.winfo_rootx() + OFFSET_X
+        y = self.widget.winfo_rooty() + OFFSET_Y
+        if ToolTip._window is None:
+            ToolTip.create_window(self.widget.winfo_toplevel())
+        # refilling the labels makes tk recompute the window size,
+        # so it is skipped when the window still shows this tooltip
+        if ToolTip._current is not self:
+            self.fill_window()
+            ToolTip._current = self
+        ToolTip._window.wm_geometry("+%d+%d" % (x, y))
+        ToolTip._window.deiconify()
+
+    @staticmethod
+    def create_window(master):
         # creates a toplevel window
-        self.tw = tk.Toplevel(self.widget)
+        tw = tk.Toplevel(master, class_="ToolTipWindow", takefocus=0)
         # Leaves only the label and removes the app window
-        self.tw.wm_overrideredirect(True)
-        self.tw.wm_geometry("+%d+%d" % (x, y))
-        if os.path.exists(self.text):
-            self.pic=True
-        if not self.pic:
-            label = tk.Label(self.tw, text=self.text, justify='left',
-                             background='yellow', relief='solid', borderwidth=1,
-                             font=("courier", "8", "normal"))
-            label.pack(ipadx=1)
-        else:
-            load = Image.open(self.text)
-            load = load.resize((800, 800)) #change to default sizing
-            render = ImageTk.PhotoImage(load)
-            img = tk.Label(self.tw, image=render)
-            img.image = render
-            img.pack(ipadx=1)
+        tw.wm_overrideredirect(True)
+        try:
+            # on aqua showing the window would otherwise activate it (same as idlelib)
+            tw.tk.call("::tk::unsupported::MacWindowStyle", "style",
+                       tw._w, "help", "noActivates")
+        except tk.TclError:
+            pass
+        ToolTip._window = tw
+        ToolTip._text_label = tk.Label(tw, name="text")
+        ToolTip._image_label = tk.Label(tw, name="image")
+
     def close(self, event=None):
-        if self.tw:
-            self.tw.destroy()
-
-
-# testing ...
-if (__name__ == '__main__'):
-    root = tk.Tk()
-    btn1 = tk.Button(root, text="button 1")
-    btn1.pack(padx=10, pady=5)
-    button1_ttp = CreateToolTip(btn1, "mouse is over button 1")
-    btn2 = tk.Button(root, text="button 2")
-    btn2.pack(padx=10, pady=5)
-    button2_ttp = CreateToolTip(btn2, "mouse is over button 2")
-    root.mainloop()
+        if ToolTip._window is not None:
+            ToolTip._window.withdraw()
+
+
+class TextToolTip(ToolTip):
+    __slots__ = ("text",)
+
+    def __init__(self, widget, text):
+        ToolTip.__init__(self, widget)
+        self.text = text
+
+    def fill_window(self):
+        ToolTip._image_label.pack_forget()
+        ToolTip._text_label.config(text=self.text)
+        ToolTip._text_label.pack(ipadx=1)
+
+
+class ImageToolTip(ToolTip):
+    __slots__ = ("path",)
+    # rendered images shared by all tooltips, keyed by image path
+    _image_cache = {}
+
+    def __init__(self, widget, path):
+        ToolTip.__init__(self, widget)
+        self.path = path
+
+    def fill_window(self):
+        render = ImageToolTip._image_cache.get(self.path)
+        if render is None:
+            # first hover of this image: show a fast nearest neighbour scaled version
+            # right away and replace it with the smooth one once tk is idle again
+            render = self.get_image(self.path, smooth=False)
+            ToolTip._window.after_idle(self.smooth_image)
+        ToolTip._text_label.pack_forget()
+        self.set_image(render)
+        ToolTip._image_label.pack(ipadx=1)
+
+    def smooth_image(self):
+        render = self.get_image(self.path, smooth=True)
+        ImageToolTip._image_cache[self.path] = render
+        if ToolTip._current is self:
+            self.set_image(render)
+
+    @staticmethod
+    def set_image(render):
+        ToolTip._image_label.config(image=render)
+        ToolTip._image_label.image = render  # tk only keeps the image while it is referenced
+
+    @staticmethod
+    def get_image(path, smooth):
+        # PIL is only imported once the first image tooltip is shown, not at startup
+        from PIL import ImageTk, Image
+        resample = Image.BICUBIC if smooth else Image.NEAREST
+        load = Image.open(path)
+        # decoders that support it (jpeg) already downscale while reading
+        load.draft("RGB", IMAGE_SIZE)
+        load = load.resize(IMAGE_SIZE, resample, reducing_gap=2.0)
+        return ImageTk.PhotoImage(load)
+
+
+@functools.lru_cache(maxsize=512)
+def path_exists(path):
+    # tooltips of several widgets often point to the same image
+    return os.path.exists(path)
+
+
+def CreateToolTip(widget, text='widget info', pic=False):
+    '''
+    create a tooltip for a given widget, text can also be the path of an image
+    '''
+    # only texts that look like a path are checked for being an existing image file,
+    # files without one of the IMAGE_ENDINGS are shown as image if they exist
+    looks_like_path = text.lower().endswith(IMAGE_ENDINGS) or os.sep in text or "/" in text
+    if pic or looks_like_path and path_exists(text):
+        return ImageToolTip(widget, text)
+    return TextToolTip(widget, text)
@@ -1,24 +1,48 @@
 #!/usr/bin/env python3
 
+from collections import namedtuple
 from configparser import ConfigParser
-import logging
-from preflop_advisor.tree_reader_helpers import ActionProcessor
-import cProfile
-
-# Result Data Structure Keys:
-# IS_INFO = "isInfo"
-# RESULTS = "Results"
-# TEXT = "Text"
+from preflop_advisor.config_helper import TreeInfo
+from preflop_advisor.tree_reader_helpers import ActionProcessor, split_config_list
+
+# Result Data Structure:
+# every cell of the result table is a Cell, info cells only have a text
+# and result cells only the results of the action processor
+Cell = namedtuple("Cell", "isInfo text results")
+# cells are immutable, so the cells that never change are shared by all tables
+X_CELL = Cell(True, "X", None)
+FI_CELL = Cell(True, "FI", None)
+EMPTY_CELL = Cell(False, None, ())
 # RFI_DIC = {"Raise100": "R100", "AllIn": "AllIn"}
 
+# a new TreeReader is created for every output update, the action processors
+# are kept per (folder, positions, configs) so their lookups are reused
+# processors are shared, so callers must not change their state
+# range files added or removed while the app runs are seen on the next update
+ACTION_PROCESSORS = {}
+# position tuple -> {scenario: {(position, other position): action before tuple}}
+SCENARIOS = {}
+
+
+def get_action_processor(position_list, tree_infos, configs):
+    # the processor keeps a reference to configs, so its id is not reused while it is cached
+    key = (tree_infos.folder, tuple(position_list), id(configs))
+    action_processor = ACTION_PROCESSORS.get(key)
+    if action_processor is None:
+        action_processor = ACTION_PROCESSORS[key] = ActionProcessor(
+            position_list, tree_infos, configs, ActionProcessor.shared_cache())
+    action_processor.refresh_if_changed()
+    return action_processor
+
 
 class TreeReader():
     def __init__(self, hand, position, tree_infos, configs):
 
-        self.full_position_list = configs["Positions"].split(",")
+        self.full_position_list = list(split_config_list(configs["Positions"]))
         self.position_list = []
-        self.num_players = tree_infos["plrs"]
+        self.num_players = tree_infos.plrs
         self.init_position_list(self.num_players, self.full_position_list)
+        self.init_scenarios()
 
         self.hand = hand
         self.position = None if position not in self.full_position_list else position
@@ -26,210 +50,230 @@ class TreeReader():
         self.configs = configs
         self.tree_infos = tree_infos
 
-        self.action_processor = ActionProcessor(
-            self.position_list, self.tree_infos, configs)
+        self.action_processor = get_action_processor(self.position_list, self.tree_infos, configs)
 
         self.results = []
+        # (action before tuple, position) -> results, many lookups recur in the table
+        self._ap_cache = {}
+
+    def get_action_results(self, action_before_list, position):
+        key = (tuple(action_before_list), position)
+        results = self._ap_cache.get(key)
+        if results is None:
+            results = self._ap_cache[key] = self.action_processor.get_results(
+                self.hand, action_before_list, position)
+        return results
+
+    def prefetch_action_results(self, jobs):
+        # looks up all (action_before_list, position) jobs that are not cached yet in one batch
+        keys = list(dict.fromkeys(
+            (tuple(action_before_list), position) for action_before_list, position in jobs))
+        keys = [key for key in keys if key not in self._ap_cache]
+        batch_results = self.action_processor.get_results_batch(
+            self.hand, [(list(actions), position) for actions, position in keys])
+        self._ap_cache.update(zip(keys, batch_results))
+
+    def get_rfi_actions(self, position):
+        # bb can only open after a sb limp
+        return [] if position != "BB" else [("SB", "Call")]
 
     def init_position_list(self, num_players, positions):
         self.position_list = positions
         self.position_list = self.position_list[0:num_players]
         self.position_list.reverse()
+        # position -> index in position_list, looked up for every cell
+        self.position_index = {position: index for index, position in enumerate(self.position_list)}
+        self.vs_header_cells = [Cell(True, "vs " + position, None) for position in self.position_list]
 
     def fill_default_results(self):
-        row = []
-        row.append({"isInfo": True, "Text": "X"})
-        row.append({"isInfo": True, "Text": "FI"})
-        for position in self.position_list:
-            row.append({"isInfo": True, "Text": "vs " + position})
-        self.results.append(row)
+        self.results.extend(self.iter_default_rows())
 
-        for row_pos in self.position_list:
-            row = [{"isInfo": True, "Text": row_pos}]
-            if row_pos != "BB":
-                row.append(
-                    {"isInfo": False, "Results": self.action_processor.get_results(self.hand, [], row_pos)})
-            else:
-                row.append(
-                    {"isInfo": False, "Results": self.action_processor.get_results(self.hand, [("SB", "Call")], row_pos)})
+    def iter_default_rows(self):
+        row = [X_CELL, FI_CELL] + self.vs_header_cells
+        yield row
 
+        vs_first_in = self.precompute_vs_first_in(self.position_list)
+        for row_pos in self.position_list:
+            row = [Cell(True, row_pos, None)]
+            row.append(Cell(False, None, self.get_action_results(self.get_rfi_actions(row_pos), row_pos)))
+            row.extend([Cell(False, None, vs_first_in.get((row_pos, column_pos), []))
+                        for column_pos in self.position_list])
+            yield row
+
+    def precompute_vs_first_in(self, row_positions):
+        # returns {(position, fi_position): results} for all valid vs first in cells of the rows,
+        # the rfi and vs first in lookups of the rows are collected first
+        # so the action processor can read each range file once
+        jobs = {}
+        rfi_jobs = [(self.get_rfi_actions(row_pos), row_pos) for row_pos in row_positions]
+        for row_pos in row_positions:
             for column_pos in self.position_list:
-                row.append(
-                    {"isInfo": False, "Results": self.get_vs_first_in(
-                        row_pos, column_pos)}
-                )
-            self.results.append(row)
+                action_before_list = self.scenarios["vs first in"].get((row_pos, column_pos))
+                if action_before_list is not None:
+                    jobs[(row_pos, column_pos)] = (action_before_list, row_pos)
+        self.prefetch_action_results(rfi_jobs + list(jobs.values()))
+        return {cell: self.get_action_results(*job) for cell, job in jobs.items()}
 
     def get_results(self):
-        self.results = []
-        if self.position:
-            self.fill_position_results()
-        else:
-            self.fill_default_results()
+        self.results = list(self.iter_results())
         return self.results
 
+    def iter_results(self):
+        # yields the rows one by one, so a caller can show the first rows before the rest is looked up
+        if self.position:
+            return self.iter_position_rows()
+        return self.iter_default_rows()
+
     def fill_position_results(self):
+        self.results.extend(self.iter_position_rows())
 
+    def iter_position_rows(self):
         # Info Line
         pos = self.position
-        row = []
-        row.append({"isInfo": True, "Text": pos})
-        for position in self.position_list:
-            row.append({"isInfo": True, "Text": "vs " + position})
-        self.results.append(row)
+        row = [Cell(True, pos, None)] + self.vs_header_cells
+        yield row
 
         # RFI Line (without infos)
-        if pos != "BB":
-            row = [{"isInfo": False, "Results": self.action_processor.get_results(
-                self.hand, [], pos)}]
-        else:
-            row = [{"isInfo": False, "Results": self.action_processor.get_results(
-                self.hand, [("SB", "Call")], pos)}]
-
-        for column_pos in self.position_list:
-            row.append(
-                {"isInfo": False, "Results": self.get_vs_first_in(
-                    pos, column_pos)}
-            )
-        self.results.append(row)
+        vs_first_in = self.precompute_vs_first_in([pos])
+        row = [Cell(False, None, self.get_action_results(self.get_rfi_actions(pos), pos))]
+        row.extend([Cell(False, None, vs_first_in.get((pos, column_pos), []))
+                    for column_pos in self.position_list])
+        yield row
 
         # SB special infos because of limp
         if pos == "SB":
-            row = [{"isInfo": True, "Text": "after Limp"}]
-            for column_pos in self.position_list:
-                if column_pos == "BB":
-                    row.append(
-                        {"isInfo": False, "Results": self.action_processor.get_results(self.hand, [("SB", "Call"), ("BB", "Raise")], pos)})
-                else:
-                    row.append({"isInfo": False, "Results": []})
-            self.results.append(row)
+            row = [Cell(True, "after Limp", None)]
+            vs_bb_raise = Cell(False, None, self.get_action_results([("SB", "Call"), ("BB", "Raise")], pos))
+            row.extend([vs_bb_raise if column_pos == "BB" else EMPTY_CELL
+                        for column_pos in self.position_list])
+            yield row
 
         # squeeze line
-        row = [{"isInfo": True, "Text": "squeeze"}]
-        for column_pos in self.position_list:
-            row.append(
-                {"isInfo": False, "Results": self.get_squeeze(pos, column_pos)}
-            )
-        self.results.append(row)
+        row = [Cell(True, "squeeze", None)]
+        row.extend([Cell(False, None, self.get_squeeze(pos, column_pos)) for column_pos in self.position_list])
+        yield row
 
         # 4bet
-        row = [{"isInfo": True, "Text": "4bet"}]
-        for column_pos in self.position_list:
-            row.append(
-                {"isInfo": False, "Results": self.get_4bet(pos, column_pos)}
-            )
-        self.results.append(row)
+        row = [Cell(True, "4bet", None)]
+        row.extend([Cell(False, None, self.get_4bet(pos, column_pos)) for column_pos in self.position_list])
+        yield row
 
         # vs 4bet
-        row = [{"isInfo": True, "Text": "vs 4bet"}]
-        for column_pos in self.position_list:
-            row.append(
-                {"isInfo": False, "Results": self.get_vs_4bet(pos, column_pos)}
-            )
-        self.results.append(row)
+        row = [Cell(True, "vs 4bet", None)]
+        row.extend([Cell(False, None, self.get_vs_4bet(pos, column_pos)) for column_pos in self.position_list])
+        yield row
 
         # vs squeeze
-        row = [{"isInfo": True, "Text": "vs squeeze"}]
-        for column_pos in self.position_list:
-            row.append(
-                {"isInfo": False, "Results": self.get_vs_squeeze(
-                    pos, column_pos)}
-            )
-        self.results.append(row)
+        row = [Cell(True, "vs squeeze", None)]
+        row.extend([Cell(False, None, self.get_vs_squeeze(pos, column_pos)) for column_pos in self.position_list])
+        yield row
 
-        return
+    def get_scenario_results(self, scenario, position, other_position):
+        action_before_list = self.scenarios[scenario].get((position, other_position))
+        if action_before_list is None:
+            return []
+        return self.get_action_results(action_before_list, position)
+
+    def init_scenarios(self):
+        # the action sequences of all spots only depend on the position list,
+        # so they are built once per position list and shared by all readers
+        key = tuple(self.position_list)
+        self.scenarios = SCENARIOS.get(key)
+        if self.scenarios is not None:
+            return
+        self.scenarios = SCENARIOS[key] = {}
+        for scenario, get_actions in (("vs first in", self.get_vs_first_in_actions),
+                                      ("vs 4bet", self.get_vs_4bet_actions),
+                                      ("vs squeeze", self.get_vs_squeeze_actions),
+                                      ("4bet", self.get_4bet_actions),
+                                      ("squeeze", self.get_squeeze_actions)):
+            spots = self.scenarios[scenario] = {}
+            for position in self.position_list:
+                for other_position in self.position_list:
+                    action_before_list = get_actions(position, other_position)
+                    if action_before_list is not None:
+                        spots[(position, other_position)] = tuple(action_before_list)
 
     def get_vs_first_in(self, position, fi_position):
-        if position == fi_position:
-            return []
-        if self.position_list.index(position) > self.position_list.index(fi_position):
+        return self.get_scenario_results("vs first in", position, fi_position)
+
+    def get_vs_first_in_actions(self, position, fi_position):
+        if position == fi_position or position not in self.position_index or fi_position not in self.position_index:
+            return None
+        if self.position_index[position] > self.position_index[fi_position]:
             # we face an open
-            results = self.action_processor.get_results(
-                self.hand, [(fi_position, "Raise")], position)
-        else:
-            # we face a 3bet after an open (could include sb limp -> bb raises?!)
-            results = self.action_processor.get_results(
-                self.hand, [(position, "Raise"),
-                            (fi_position, "Raise")], position
-            )
-        return results
+            return [(fi_position, "Raise")]
+        # we face a 3bet after an open (could include sb limp -> bb raises?!)
+        return [(position, "Raise"), (fi_position, "Raise")]
 
     def get_vs_4bet(self, position, reraise_position):
-        pos_index = self.position_list.index(position)
+        return self.get_scenario_results("vs 4bet", position, reraise_position)
+
+    def get_vs_4bet_actions(self, position, reraise_position):
+        if position not in self.position_index or reraise_position not in self.position_index:
+            return None
+        pos_index = self.position_index[position]
         # both same position or utg spot where there is no possible face 4bet
         if position == reraise_position or pos_index == 0:
-            return []
-        if pos_index > self.position_list.index(reraise_position):
+            return None
+        if pos_index > self.position_index[reraise_position]:
             # we 3bet and face a 4bet from the opener:
-            results = self.action_processor.get_results(
-                self.hand, [(reraise_position, "Raise"), (position,
-                                                          "Raise"), (reraise_position, "Raise")], position
-            )
-        else:
-            # we face cold4bet after the position before us opens and we 3bet:
-            opener = self.position_list[pos_index - 1]
-            results = self.action_processor.get_results(
-                self.hand, [(opener, "Raise"), (position, "Raise"),
-                            (reraise_position, "Raise")], position
-            )
-        return results
+            return [(reraise_position, "Raise"), (position, "Raise"), (reraise_position, "Raise")]
+        # we face cold4bet after the position before us opens and we 3bet:
+        opener = self.position_list[pos_index - 1]
+        return [(opener, "Raise"), (position, "Raise"), (reraise_position, "Raise")]
 
     def get_vs_squeeze(self, position, squeeze_position):
-        pos_index = self.position_list.index(position)
-        squeeze_index = self.position_list.index(squeeze_position)
+        return self.get_scenario_results("vs squeeze", position, squeeze_position)
+
+    def get_vs_squeeze_actions(self, position, squeeze_position):
+        if position not in self.position_index or squeeze_position not in self.position_index:
+            return None
+        pos_index = self.position_index[position]
+        squeeze_index = self.position_index[squeeze_position]
 
         if squeeze_index <= pos_index + 1:  # squeezer must be after opener + at least one coldcall in between
-            return []
+            return None
 
-        results = self.action_processor.get_results(
-            self.hand, [(position, "Raise"), (self.position_list[pos_index+1],
-                                              "Call"), (squeeze_position, "Raise")], position
-        )
-        return results
+        return [(position, "Raise"), (self.position_list[pos_index+1], "Call"), (squeeze_position, "Raise")]
 
     def get_4bet(self, position, threebet_position):
-        pos_index = self.position_list.index(position)
-        threebet_pos_index = self.position_list.index(threebet_position)
+        return self.get_scenario_results("4bet", position, threebet_position)
+
+    def get_4bet_actions(self, position, threebet_position):
+        if position not in self.position_index or threebet_position not in self.position_index:
+            return None
+        pos_index = self.position_index[position]
+        threebet_pos_index = self.position_index[threebet_position]
 
         if position == threebet_position:
-            return []
+            return None
         if pos_index > threebet_pos_index:  # cold4bet spot
             if threebet_pos_index == 0:  # vs utg there is no cold4bet
-                return []
-            else:
-                results = self.action_processor.get_results(
-                    self.hand,
-                    [(self.position_list[threebet_pos_index-1], "Raise"),
-                     (threebet_position, "Raise")],
-                    position
-                )
-        else:  # std face 3bet spot after open
-            results = self.action_processor.get_results(
-                self.hand,
-                [(position, "Raise"), (threebet_position, "Raise")],
-                position
-            )
-        return results
+                return None
+            return [(self.position_list[threebet_pos_index-1], "Raise"), (threebet_position, "Raise")]
+        # std face 3bet spot after open
+        return [(position, "Raise"), (threebet_position, "Raise")]
 
     def get_squeeze(self, position, rfi_position):
-        pos_index = self.position_list.index(position)
-        rfi_index = self.position_list.index(rfi_position)
+        return self.get_scenario_results("squeeze", position, rfi_position)
 
-        if pos_index <= rfi_index + 1:  # we have to have at least one player in between rfi and coldcaller
-            return []
+    def get_squeeze_actions(self, position, rfi_position):
+        if position not in self.position_index or rfi_position not in self.position_index:
+            return None
+        pos_index = self.position_index[position]
+        rfi_index = self.position_index[rfi_position]
 
-        results = self.action_processor.get_results(
-            self.hand, [(rfi_position, "Raise"),
-                        (self.position_list[rfi_index+1], "Call")], position
-        )
-        return results
+        if pos_index <= rfi_index + 1:  # we have to have at least one player in between rfi and coldcaller
+            return None
 
+        return [(rfi_position, "Raise"), (self.position_list[rfi_index+1], "Call")]
 
 def test():
     config = ConfigParser()
     config.read("config.ini")
     config = config["TreeReader"]
-    tree = {"Path": "/home/johann/monker/ranges/Omaha/6-way/100bb/", "NumPlayers": 6}
+    tree = TreeInfo(0, 6, 100, "PLO", "/home/johann/monker/ranges/Omaha/6-way/100bb/", "")
     position_list = ["UTG", "MP", "CO", "BU", "SB", "BB"]
     hand = "AhKs4h3s"
     tree_reader = TreeReader(hand, "X", tree, config)
@@ -242,4 +286,5 @@ def test():
 
 
 if (__name__ == '__main__'):
+    import cProfile
     cProfile.run('test()')
@@ -1,27 +1,118 @@
 #!/usr/bin/env python3
 
 from configparser import ConfigParser
+from preflop_advisor.config_helper import TreeInfo
 from preflop_advisor.hand_convert_helper import convert_hand
 from collections import OrderedDict
 
+import functools
+import hashlib
 import logging
+import mmap
+import os
 import os.path
+import pickle
+
+logger = logging.getLogger(__name__)
+# smaller range files are read in one call, mapping them costs more than it saves
+MIN_MMAP_SIZE = 64 * 1024
+# madvise hint for mapped range files, None before python 3.8 and on windows
+MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)
+# a result is a (last action, frequency, ev) tuple, this one is used if the lookup failed
+NO_RESULT = ("", 0, 0)
+# parsed range files are pickled with this ending into a folder per range folder below PickleFolder,
+# writing them into the range folder would change its mtime and look like a changed tree
+PICKLE_ENDING = ".pkl"
+DEFAULT_PICKLE_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "preflop_advisor")
+
+
+def find_info_line(data, hand):
+    # data is the content of a range file (bytes or mmap) where every hand line
+    # is followed by its info line, returns the info line of hand as bytes or b""
+    # the whole line is matched to distinguish between 2345 and (2345)
+    hand = hand.encode()
+    for newline in (b"\n", b"\r\n"):
+        needle = hand + newline
+        if data[:len(needle)] == needle:
+            start = len(needle)
+        else:
+            index = data.find(newline[-1:] + needle)
+            if index == -1:
+                continue
+            start = index + 1 + len(needle)
+        end = data.find(b"\n", start)
+        return data[start:end if end != -1 else len(data)].strip()
+    return b""
+
+
+def parse_info_line(info_line):
+    # "frequency;ev" as str or bytes, some info lines only contain the frequency
+    frequency, _, ev = info_line.partition(b";" if isinstance(info_line, bytes) else ";")
+    return float(frequency), float(ev) if ev.strip() else 0.0
+
+
+def parse_hand_infos(data):
+    # data is the content of a range file (bytes or mmap), returns {hand: info line}
+    # every step works on the whole file at once, so no python code runs per line,
+    # an info line is only parsed into floats when its hand is looked up
+    lines = str(data, "utf-8").splitlines()
+    # assuming every hand is followed by its info line
+    return dict(zip(map(str.strip, lines[0::2]), lines[1::2]))
+
+
+@functools.lru_cache(maxsize=32)
+def split_config_list(raw):
+    # an ActionProcessor is created for every output update but the config lists rarely change
+    return tuple(raw.replace(" ", "").split(","))
+
+
+@functools.lru_cache(maxsize=64)
+def list_range_files(path, ending):
+    # names of the range files in path, listed once for all processors of a folder
+    try:
+        with os.scandir(path) as entries:
+            return frozenset(
+                entry.name for entry in entries if entry.name.endswith(ending) and entry.is_file())
+    except EnvironmentError:
+        logger.error("Could not read Folder: %s", path)
+        return frozenset()
 
-CACHE = OrderedDict()
 
 class ActionProcessor():
-    def __init__(self, position_list, tree_infos, configs):
+    _shared_cache = None
+    # filename -> (open mmap, size, mtime in ns) of a range file, shared since the files are only read
+    _mmap_cache = OrderedDict()
+
+    def __init__(self, position_list, tree_infos, configs, cache=None):
         self.configs = configs  # just saving total info dictionaries for later
         self.tree_infos = tree_infos
 
         self.position_list = position_list
-        self.valid_actions = configs["ValidActions"].replace(
-            " ", "").split(",")
-        self.valid_raise_sizes = configs["RaiseSizeList"].replace(
-            " ", "").split(",")
-        self.path = tree_infos["folder"]
-        #self.cache = OrderedDict()
+        self.position_index = {position: index for index, position in enumerate(position_list)}
+        self.valid_actions = split_config_list(configs["ValidActions"])
+        self.valid_raise_sizes = split_config_list(configs["RaiseSizeList"])
+        self.path = tree_infos.folder
+        # filename -> hand infos, ordered from least to most recently used
+        self.cache = OrderedDict() if cache is None else cache
         self.cache_size = int(self.configs["CacheSize"])
+        self.use_mmap = self.configs.get("UseMmap", "0") == "1"
+        self.fd_cache_size = int(self.configs.get("FdCacheSize", "0"))
+        self.pickle_cache = self.configs.get("PickleCache", "0") == "1"
+        self.pickle_path = os.path.join(
+            self.configs.get("PickleFolder") or DEFAULT_PICKLE_FOLDER,
+            hashlib.md5(os.path.abspath(self.path).encode()).hexdigest())
+        # the caches below depend on the files in the range folder, refresh_if_changed resets them
+        self._filename_cache = {}  # action sequence tuple -> filename
+        self._sequence_cache = {}  # (action before tuple, position) -> full action sequences
+        self._rng_files = None  # names of the range files, listed on the first lookup
+        self._dir_mtime = None  # modification time of the range folder when it was checked last
+
+    @classmethod
+    def shared_cache(cls):
+        # for callers that create a new ActionProcessor per lookup but want to keep the files
+        if cls._shared_cache is None:
+            cls._shared_cache = OrderedDict()
+        return cls._shared_cache
 
     def get_action_sequence(self, action_list):
         # action list contains all "active" actions of players as tuples (position, action)
@@ -29,48 +120,86 @@ class ActionProcessor():
 
         full_action_list = []
         start_index = 0
-        position_already_folded = []
-
-        for action in action_list:
-            for index in range(len(self.position_list)):
-                position_index = (
-                    index + start_index) % len(self.position_list)
-                position = self.position_list[position_index]
-                if position != action[0]:
-                    if position not in position_already_folded:
-                        full_action_list.append((position, "Fold"))
-                        position_already_folded.append(position)
-                else:
-                    full_action_list.append((position, action[1]))
-                    start_index = position_index + 1
-                    break
+        position_already_folded = set()
+        num_positions = len(self.position_list)
+
+        for position, action in action_list:
+            # players between the last actor and this one fold, the actor is found by lookup
+            actor_index = self.position_index.get(position)
+            if actor_index is None:
+                steps = num_positions
+            else:
+                steps = (actor_index - start_index) % num_positions
+            for offset in range(steps):
+                folder = self.position_list[(start_index + offset) % num_positions]
+                if folder not in position_already_folded:
+                    full_action_list.append((folder, "Fold"))
+                    position_already_folded.add(folder)
+            if actor_index is not None:
+                full_action_list.append((position, action))
+                start_index = actor_index + 1
         return full_action_list
 
     def get_results(self, hand, action_before_list, position):
-        if position not in self.position_list:
-            logging.error(
-                "{} is not a valid Position for the selected Tree".format(position))
-            return []
+        return self.get_results_batch(hand, [(action_before_list, position)])[0]
+
+    def get_results_batch(self, hand, jobs):
+        # jobs is a list of (action_before_list, position) tuples, returns one result list per job
+        # every range file is read at most once, no matter how many jobs lead to it
         hand = convert_hand(hand)
-        results = []
+        file_results = {}
+        batch_results = []
+
+        for action_before_list, position in jobs:
+            results = []
+            for full_action_sequence in self.get_action_sequences(action_before_list, position):
+                filename = self.get_filename(full_action_sequence)
+                if filename not in file_results:
+                    if self.cache_size == 0:
+                        file_results[filename] = self.read_hand(hand, full_action_sequence)
+                    else:
+                        file_results[filename] = self.read_hand_with_cache(hand, full_action_sequence)
+                results.append(file_results[filename])  # tuples, safe to share between jobs
+            batch_results.append(results)
+
+        return batch_results
+
+    def add_to_cache(self, filename, hand_infos):
+        # while instead of if: a shared cache may have been filled with a bigger CacheSize
+        while self.cache and len(self.cache) >= self.cache_size:
+            self.cache.popitem(last=False)  # least recently used file
+        self.cache[filename] = hand_infos
+
+    def get_action_sequences(self, action_before_list, position):
+        # all full action sequences of position's valid actions that have a range file
+        if position not in self.position_index:
+            logger.error(
+                "%s is not a valid Position for the selected Tree", position)
+            return []
+        key = (tuple(action_before_list), position)
+        action_sequences = self._sequence_cache.get(key)
+        if action_sequences is not None:
+            return action_sequences
+        action_sequences = []
 
+        # the folds and raise sizes before position's action are the same for every action,
+        # so they are resolved once and only position's action is added per valid action
+        prefix = self.get_action_sequence(list(action_before_list) + [(position, None)])[:-1]
+        resolved_prefix = self.resolve_raise_sizes(prefix)
         for item in self.valid_actions:
-            action_sequence = action_before_list + [(position, item)]
-            full_action_sequence = self.get_action_sequence(action_sequence)
             full_action_sequence = self.find_valid_raise_sizes(
-                full_action_sequence)
+                prefix + [(position, item)], resolved_prefix)
             if self.test_action_sequence(full_action_sequence):
-                if self.cache_size == 0:
-                    result = self.read_hand(hand, full_action_sequence)
-                else:
-                    result = self.read_hand_with_cache(hand,full_action_sequence)
-                results.append(result)
+                action_sequences.append(full_action_sequence)
 
-        return results
+        self._sequence_cache[key] = action_sequences
+        return action_sequences
 
-    def find_valid_raise_sizes(self, full_action_sequence):
-        new_action_sequence = []
-        for action in full_action_sequence:
+    def resolve_raise_sizes(self, actions, resolved_prefix=()):
+        # appends actions to the already resolved prefix, every Raise is replaced
+        # by the first raise size that has a range file
+        new_action_sequence = list(resolved_prefix)
+        for action in actions:
             if action[1] != "Raise":
                 new_action_sequence.append(action)
             else:
@@ -78,89 +207,185 @@ class ActionProcessor():
                     if self.test_action_sequence(new_action_sequence + [(action[0], raise_size)]):
                         new_action_sequence.append((action[0], raise_size))
                         break  # TODO this fails if we dont find any valid raise size?
+        return new_action_sequence
+
+    def find_valid_raise_sizes(self, full_action_sequence, resolved_prefix=None):
+        # resolved_prefix is the result of resolve_raise_sizes for all but the last action
+        if resolved_prefix is None:
+            new_action_sequence = self.resolve_raise_sizes(full_action_sequence)
+        else:
+            new_action_sequence = self.resolve_raise_sizes(full_action_sequence[-1:], resolved_prefix)
 
         if len(full_action_sequence) != len(new_action_sequence):
-            if full_action_sequence[-1][1] == "Raise" and "All_In" in [action[1] for action in new_action_sequence]:
+            if full_action_sequence[-1][1] == "Raise" and any(action == "All_In" for _, action in new_action_sequence):
                 # we have all in but trying to find reraise action
                 # duno but just adding action anyway so we get empty result?
                 # print("Adding Invalid raise action to see what happens")
                 new_action_sequence.append(
                     (full_action_sequence[-1][0], self.valid_raise_sizes[-1]))
             else:
-                logging.warning(
+                logger.warning(
                     "Something went wrong with finding valid RAISE sizes...TAKE A LOOK")
-                logging.warning(
-                    "Action Sequence: {}".format(full_action_sequence))
-                logging.warning(
-                    "New Action Sequence: {}".format(new_action_sequence)
-                )
+                logger.warning(
+                    "Action Sequence: %s", full_action_sequence)
+                logger.warning(
+                    "New Action Sequence: %s", new_action_sequence)
         return new_action_sequence
 
+    def refresh(self):
+        # forget everything derived from the configs or the range folder
+        self._filename_cache.clear()
+        self.refresh_dir()
+
+    def refresh_if_changed(self):
+        # adding or removing a range file changes the modification time of the folder,
+        # a reused processor calls this once per output update to see such changes
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except EnvironmentError:
+            return  # test_action_sequence logs the missing folder
+        if mtime != self._dir_mtime:
+            if self._dir_mtime is not None:
+                self.refresh_dir()
+            self._dir_mtime = mtime
+
+    def refresh_dir(self):
+        # call if files were added or removed, the folder is listed again
+        # the resolved raise sizes depend on the files, so they are resolved again
+        self._sequence_cache.clear()
+        self.close_mapped_files()
+        self.invalidate_file_set()
+
+    def invalidate_file_set(self):
+        # the folder is listed again on the next lookup
+        list_range_files.cache_clear()
+        self._rng_files = None
+
     def test_action_sequence(self, action_sequence):
-        filename = os.path.join(self.path, self.get_filename(action_sequence))
-        return os.path.isfile(filename)
+        if self._rng_files is None:
+            self._rng_files = list_range_files(self.path, self.configs["Ending"])
+        return self.get_filename(action_sequence) in self._rng_files
     
+    def load_or_build(self, filename):
+        # like read_file_into_hash, but with PickleCache the parsed file is reused
+        # from its pickle as long as the modification time of the range file did not change
+        if not self.pickle_cache:
+            return self.read_file_into_hash(filename)
+        mtime = os.path.getmtime(filename)
+        pickle_path = os.path.join(self.pickle_path, os.path.basename(filename) + PICKLE_ENDING)
+        try:
+            with open(pickle_path, "rb") as f:
+                cached_mtime, hand_infos = pickle.load(f)
+            if cached_mtime == mtime:
+                return hand_infos
+        except (EnvironmentError, EOFError, ValueError, pickle.UnpicklingError):
+            pass  # no or broken pickle -> parse range file again
+
+        hand_infos = self.read_file_into_hash(filename)
+        tmp_path = pickle_path + ".tmp"
+        try:
+            os.makedirs(self.pickle_path, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump((mtime, hand_infos), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pickle_path)
+        except EnvironmentError:
+            logger.warning("Could not write Range Pickle: %s", pickle_path)
+        return hand_infos
+
     def read_file_into_hash(self,filename):
-        hand_info_hash = {}
-        with open(filename, "r") as f:
-            lines = f.readlines()
-            for i in range(0, len(lines), 2):  # assuming every hand is followed by its info line
-                hand = lines[i].strip()
-                info = lines[i + 1].strip()
-                hand_info_hash[hand] = info
-        return hand_info_hash
+        if self.use_mmap:
+            return self.read_file_into_hash_mmap(filename)
+        with open(filename, "rb") as f:
+            # split once here so cache hits only need a lookup
+            return parse_hand_infos(f.read())
+
+    def read_file_into_hash_mmap(self, filename):
+        # same as read_file_into_hash, recently read files stay mapped in read_mapped
+        return self.read_mapped(filename, parse_hand_infos)
+
+    def read_mapped(self, filename, parse):
+        # calls parse with the mapped file, up to FdCacheSize files stay mapped
+        # so reading them again skips the open and mmap calls
+        cached = self._mmap_cache.pop(filename, None)
+        if cached is not None:
+            mm, size, mtime = cached
+            # reading a mapping of a file that was truncated in place kills the process (SIGBUS),
+            # so a mapping is only reused while size and modification time are unchanged
+            try:
+                stat = os.stat(filename)
+            except EnvironmentError:
+                mm.close()
+                raise
+            if (stat.st_size, stat.st_mtime_ns) == (size, mtime):
+                self._mmap_cache[filename] = cached  # most recently used
+                return parse(mm)
+            mm.close()
+        with open(filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < MIN_MMAP_SIZE:  # also covers empty files, they cannot be mapped
+                return parse(f.read())
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if MADV_SEQUENTIAL is not None:
+            mm.madvise(MADV_SEQUENTIAL)  # both parsers scan the file from the start
+        if self.fd_cache_size <= 0:
+            with mm:
+                return parse(mm)
+        while len(self._mmap_cache) >= self.fd_cache_size:
+            self._mmap_cache.popitem(last=False)[1][0].close()  # least recently used file
+        self._mmap_cache[filename] = (mm, stat.st_size, stat.st_mtime_ns)
+        return parse(mm)
+
+    def close_mapped_files(self):
+        # mapped files of this folder would still show the old content after a change
+        folder = os.path.join(self.path, "")
+        for filename in [filename for filename in self._mmap_cache if filename.startswith(folder)]:
+            self._mmap_cache.pop(filename)[0].close()
 
 
     def read_hand(self, hand, action_sequence):
-        info_line = ""
+        info_line = b""
         filename = os.path.join(self.path, self.get_filename(action_sequence))
         try:
-            with open(filename, "r") as f:
-                for line in f:
-                    if hand + "\n" in line and len(line) < 12: # newline added to distinguish between 2345 and (2345)
-                        info_line = f.readline()
-                        break
+            # the file is searched in place instead of iterating over its lines in python
+            info_line = self.read_mapped(filename, lambda data: find_info_line(data, hand))
         except EnvironmentError:
-            logging.error("Could not find File: {}".format(filename))
-            logging.error("ActionSequence is: {}").format(action_sequence)
-            return ["", 0, 0]
-        logging.debug("Info Line: {} in file: {}".format(info_line, filename))
-        if info_line == "":
-            logging.error(
-                "Could not find Hand: {} in File: {}".format(hand, filename))
-            return ["", 0, 0]
-        infos = info_line.split(";")
-        frequency = float(infos[0])
-        ev = float(infos[1])
+            logger.error("Could not find File: %s", filename)
+            logger.error("ActionSequence is: %s", action_sequence)
+            return NO_RESULT
+        if logger.isEnabledFor(logging.DEBUG):  # read_hand runs for every cell
+            logger.debug("Info Line: %s in file: %s", info_line, filename)
+        if not info_line:
+            logger.error(
+                "Could not find Hand: %s in File: %s", hand, filename)
+            return NO_RESULT
+        frequency, ev = parse_info_line(info_line)
         last_action = action_sequence[-1][1]
-        return [last_action, self.beautify_freq(frequency), self.beautify_ev(ev)]
+        return (last_action, self.beautify_freq(frequency), self.beautify_ev(ev))
     
     def read_hand_with_cache(self, hand, action_sequence):
         filename = os.path.join(self.path, self.get_filename(action_sequence))
         try:
             # Check if file data is already in memory
-            if filename not in CACHE:
-                if len(CACHE) >= self.cache_size:
-                    CACHE.popitem(last=False)
-                CACHE[filename] = self.read_file_into_hash(filename)
-            
-            CACHE.move_to_end(filename)
-
-            hand_info = CACHE[filename].get(hand)
-            if not hand_info:
-                logging.error("Could not find Hand: {} in File: {}".format(hand, filename))
-                return ["", 0, 0]
-
-            infos = hand_info.split(";")
-            frequency = float(infos[0])
-            ev = float(infos[1])
+            hand_infos = self.cache.get(filename)
+            if hand_infos is None:
+                hand_infos = self.load_or_build(filename)
+                self.add_to_cache(filename, hand_infos)
+            else:
+                self.cache.move_to_end(filename)  # every hit makes the file most recently used
+
+            info_line = hand_infos.get(hand)
+            if info_line is None:
+                logger.error("Could not find Hand: %s in File: %s", hand, filename)
+                return NO_RESULT
+
+            frequency, ev = parse_info_line(info_line)
             last_action = action_sequence[-1][1]
-            return [last_action, self.beautify_freq(frequency), self.beautify_ev(ev)]
+            return (last_action, self.beautify_freq(frequency), self.beautify_ev(ev))
 
         except EnvironmentError:
-            logging.error("Could not find File: {}".format(filename))
-            logging.error("ActionSequence is: {}").format(action_sequence)
-            return ["", 0, 0]
+            logger.error("Could not find File: %s", filename)
+            logger.error("ActionSequence is: %s", action_sequence)
+            return NO_RESULT
 
     def beautify_ev(self, ev):
         return ev
@@ -169,11 +394,22 @@ class ActionProcessor():
         return freq
 
     def get_filename(self, action_sequence):
-        filename = ""
-        for position, action in action_sequence:
-            filename = filename + "." + self.configs[action]
-        filename = filename[1:]
-        filename += self.configs["Ending"]
+        key = tuple(action_sequence)
+        filename = self._filename_cache.get(key)
+        if filename is None:
+            configs = self.configs
+            parts = []
+            for position, action in action_sequence:
+                part = configs.get(action)
+                if part is None:
+                    # such a sequence has no range file, the empty name is never in the file set
+                    logger.warning("No Config Entry for Action: %s", action)
+                    filename = ""
+                    break
+                parts.append(part)
+            else:
+                filename = ".".join(parts) + configs["Ending"]
+            self._filename_cache[key] = filename
         return filename
 
 
@@ -181,7 +417,7 @@ def test():
     config = ConfigParser()
     config.read("config.ini")
     config = config["TreeReader"]
-    tree = {"Path": "/home/johann/monker/ranges/Omaha/6-way/100bb/"}
+    tree = TreeInfo(0, 6, 100, "PLO", "/home/johann/monker/ranges/Omaha/6-way/100bb/", "")
     position_list = ["UTG", "MP", "CO", "BU", "SB", "BB"]
     action_sequence = ActionProcessor(position_list, tree, config)
     action_list = [("CO", "Raise"), ("BU", "Raise")]
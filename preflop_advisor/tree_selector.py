@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
+import functools
 import tkinter as tk
 from configparser import ConfigParser
+from preflop_advisor.config_helper import TreeInfo
 from preflop_advisor.tooltip import CreateToolTip
 
 
@@ -18,6 +20,8 @@ class TreeSelector(tk.Frame):
         self.font = tree_selector_settings["Font"]
         self.background = tree_selector_settings["Background"]
         self.background_pressed = tree_selector_settings["BackgroundPressed"]
+        # built once and shared by all buttons
+        self.button_font = (self.font, self.fontsize, 'bold')
         self.trees = []
 
         self.process_tree_infos(tree_configs)
@@ -32,19 +36,8 @@ class TreeSelector(tk.Frame):
         self.select_button(self.current_tree)
 
     def process_tree_infos(self, tree_infos):
-        for index,table in enumerate(tree_infos):
-            infos = tree_infos[table].split(",")
-            table_dic = {}
-            table_dic["index"] = index
-            table_dic["plrs"] = int(infos[0])
-            table_dic["bb"] = int(infos[1])
-            table_dic["game"] = infos[2]
-            table_dic["folder"] = infos[3]
-            table_dic["infos"]=infos[4]
-            info_length = len(infos[4])
-            if info_length < 11:
-                table_dic["infos"]=" "*(11-info_length)+infos[4]
-            self.trees.append(table_dic)
+        # the parsed trees are shared by all selectors built from the same TreeInfos section
+        self.trees.extend(parse_tree_infos(tuple(tree_infos.values())))
 
     def create_tooltip_list(self):
         tooltip_list = []
@@ -54,21 +47,23 @@ class TreeSelector(tk.Frame):
         return tip
 
     def create_button(self, row):
-        plr_txt = str(self.trees[row]["plrs"]) + "-max "
-        bb_txt = " "*(3-len(str(self.trees[row]["bb"]))) + str(self.trees[row]["bb"]) + "bb " 
+        tree = self.trees[row]
+        plr_txt = str(tree.plrs) + "-max "
+        bb_txt = " "*(3-len(str(tree.bb))) + str(tree.bb) + "bb " 
         #text = str(self.trees[row]["plrs"]) + "m " + \
         #    str(self.trees[row]["bb"]) + "bb" + " " + self.trees[row]["infos"] 
         #self.trees[row]["game"] + " " +
 
-        text = plr_txt + bb_txt + self.trees[row]["game"]+" " + self.trees[row]["infos"]
+        text = plr_txt + bb_txt + tree.game+" " + tree.infos
         if len(text) > self.button_width:
             self.button_width = len(text)
+        # all options are passed on creation, a separate config call would be a second tk command
         button = tk.Button(
-            self, text=text, command=self.on_button_clicked(row))
-        button.config(height=self.button_height,
-                      width=self.button_width,
-                      bg=self.background,
-                      font=(self.font, self.fontsize, 'bold'), padx=self.button_pad, pady=self.button_pad)
+            self, text=text, command=self.on_button_clicked(row),
+            height=self.button_height,
+            width=self.button_width,
+            bg=self.background,
+            font=self.button_font, padx=self.button_pad, pady=self.button_pad)
         button.grid(row=row)
         return button
 
@@ -107,6 +102,15 @@ class TreeSelector(tk.Frame):
         return self.trees[self.current_tree]
 
 
+@functools.lru_cache(maxsize=8)
+def parse_tree_infos(table_lines):
+    # plrs,bb,game,folder,infos - infos is right aligned so the button texts line up
+    return tuple(TreeInfo(index, int(plrs), int(bb), game, folder, infos.rjust(11),
+                          "{}-max {}bb {} {}".format(int(plrs), int(bb), game, infos.rjust(11)))
+                 for index, (plrs, bb, game, folder, infos, *rest)
+                 in enumerate(line.split(",") for line in table_lines))
+
+
 def test(root):
     configs = ConfigParser()
     configs.read("../config.ini")